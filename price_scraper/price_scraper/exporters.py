@@ -0,0 +1,22 @@
+from typing import Any, BinaryIO
+
+import orjson
+from scrapy.exporters import BaseItemExporter
+from scrapy.utils.serialize import ScrapyJSONEncoder
+
+
+class OrjsonLinesExporter(BaseItemExporter):
+    """
+    Drop-in replacement for Scrapy's JsonLinesItemExporter that serializes with orjson.
+    orjson produces UTF-8 bytes directly, so lines are written without a separate encode step.
+    Types orjson can't handle natively (sets, Decimals, Items) fall back to Scrapy's JSON encoder.
+    """
+
+    def __init__(self, file: BinaryIO, **kwargs: Any):
+        super().__init__(dont_fail=True, **kwargs)
+        self.file = file
+        self._fallback = ScrapyJSONEncoder().default
+
+    def export_item(self, item: Any) -> None:
+        itemdict = dict(self._get_serialized_fields(item))
+        self.file.write(orjson.dumps(itemdict, default=self._fallback, option=orjson.OPT_APPEND_NEWLINE))
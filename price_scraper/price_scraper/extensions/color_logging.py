@@ -0,0 +1,58 @@
+from colorlog import ColoredFormatter
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.log import get_scrapy_root_handler
+
+_color_formatter = ColoredFormatter(
+    (
+        "%(log_color)s%(levelname)-8s%(reset)s "
+        "%(yellow)s[%(asctime)s]%(reset)s"
+        "%(white)s %(name)s %(funcName)s %(bold_purple)s:%(lineno)d%(reset)s "
+        "%(log_color)s%(message)s%(reset)s"
+    ),
+    datefmt="%d-%m-%y %H:%M:%S",
+    log_colors={
+        "DEBUG": "cyan",
+        "INFO": "green",
+        "WARNING": "yellow",
+        "ERROR": "bold_red",
+        "CRITICAL": "red,bg_white",
+    },
+)
+
+
+class ColorLogging:
+    """
+    A Scrapy extension that colorizes console log output.
+    Crawler.crawl() reinstalls Scrapy's root log handler after extensions are built, so the
+    formatter is set on the handler once the spider opens instead of patching how Scrapy
+    creates handlers.
+    """
+
+    # __weakref__ is required: signal receivers are stored as weak references
+    __slots__ = ("__weakref__",)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        """
+        Factory method to create an instance, connecting signals.
+        Checks if the extension is enabled in settings.
+        """
+        if not crawler.settings.getbool("COLOR_LOGGING_ENABLED", True):
+            raise NotConfigured("ColorLogging extension is disabled by setting.")
+
+        ext = cls()
+        # spider_opened is the first signal after the handler is reinstalled
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        return ext
+
+    def spider_opened(self, spider):
+        """
+        Called when the spider is opened. Sets the color formatter on Scrapy's root handler
+        when it writes to a terminal.
+        """
+        handler = get_scrapy_root_handler()
+        # Only colorize terminals; files and pipes keep Scrapy's plain (cheaper) formatter
+        stream = getattr(handler, "stream", None)
+        if stream is not None and stream.isatty():
+            handler.setFormatter(_color_formatter)
@@ -11,6 +11,9 @@ class RuntimeLogger:
     finish reason, and total runtime of a spider.
     """
 
+    # __weakref__ is required: signal receivers are stored as weak references
+    __slots__ = ("stats", "logger", "start_time", "__weakref__")
+
     def __init__(self, stats: StatsCollector):
         """
         Initialize the RuntimeLogger extension.
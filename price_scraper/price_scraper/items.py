@@ -4,13 +4,26 @@ from w3lib.html import remove_tags
 import re
 import logging
 
+# Deletes every ASCII character except digits and '.', so the common case never touches the regex engine.
+_PRICE_DELETE_TABLE = str.maketrans("", "", "".join(chr(i) for i in range(128) if not (chr(i).isdigit() or i == 46)))
+_PRICE_STRIP_RE = re.compile(r"[^\d.]")
+_PRICE_VALID_RE = re.compile(r"\d+(?:\.\d*)?|\.\d+")
+
 # --- Helper Functions ---
 
 
 def clean_text(text):
     """Removes leading/trailing whitespace, reduces internal whitespace, handles non-strings."""
     if text:
-        return " ".join(str(text).split()).strip()
+        # str.split() breaks on exactly the characters r"\s" matches, and split/join beats re.sub by ~3x
+        return " ".join(str(text).split())
+    return text
+
+
+def clean_html_text(text):
+    """Strips HTML tags and normalizes whitespace in one step (fused remove_tags + clean_text)."""
+    if text:
+        return " ".join(remove_tags(str(text)).split())
     return text
 
 
@@ -25,17 +38,15 @@ def parse_price(text):
     """Extracts numerical price, removing any non-digit/non-decimal characters."""
     if not text:
         return None
-    cleaned_text = re.sub(r"[^\d.]", "", str(text))
-    try:
-        if not cleaned_text or cleaned_text.count(".") > 1:
-            logging.debug(f"Price parsing resulted in invalid format: '{cleaned_text}' from '{text}'")
-            return None
-        price = float(cleaned_text)
-        # Treat 0 price as potentially unavailable or 'Call for Price'
-        return price if price > 0 else None
-    except (ValueError, TypeError) as e:
-        logging.warning(f"Could not parse price from text: '{text}' -> cleaned: '{cleaned_text}'. Error: {e}")
+    cleaned_text = str(text).translate(_PRICE_DELETE_TABLE)
+    if not cleaned_text.isascii():
+        cleaned_text = _PRICE_STRIP_RE.sub("", cleaned_text)
+    if not _PRICE_VALID_RE.fullmatch(cleaned_text):
+        logging.debug("Price parsing resulted in invalid format: '%s' from '%s'", cleaned_text, text)
         return None
+    price = float(cleaned_text)
+    # Treat 0 price as potentially unavailable or 'Call for Price'
+    return price if price > 0 else None
 
 
 # --- Item Definition for Category Links ---
@@ -45,7 +56,7 @@ class CategoryItem(scrapy.Item):
     """Represents a category link extracted from the navigation menu."""
 
     category_name = scrapy.Field(
-        input_processor=MapCompose(remove_tags, clean_text),
+        input_processor=MapCompose(clean_html_text),
         output_processor=TakeFirst(),
     )
     category_url = scrapy.Field(output_processor=TakeFirst())
@@ -59,7 +70,7 @@ class RyansProductDetailItem(scrapy.Item):
 
     # --- Core Product Info ---
     name = scrapy.Field(
-        input_processor=MapCompose(remove_tags, clean_text),
+        input_processor=MapCompose(clean_html_text),
         output_processor=TakeFirst(),
     )
     url = scrapy.Field(output_processor=TakeFirst())
@@ -109,7 +120,7 @@ class StartechProductDetailItem(scrapy.Item):
     """
 
     # --- Core Product Info ---
-    name = scrapy.Field(input_processor=MapCompose(remove_tags, clean_text), output_processor=TakeFirst())
+    name = scrapy.Field(input_processor=MapCompose(clean_html_text), output_processor=TakeFirst())
     url = scrapy.Field(output_processor=TakeFirst())
     category = scrapy.Field(input_processor=MapCompose(clean_text), output_processor=TakeFirst())
     brand = scrapy.Field(input_processor=MapCompose(clean_text), output_processor=TakeFirst())
@@ -1,5 +1,9 @@
 import logging
 import random
+from collections import deque
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+
 from scrapy.downloadermiddlewares.retry import RetryMiddleware
 from scrapy.utils.response import response_status_message
 
@@ -16,8 +20,17 @@ class UserAgentRotatorMiddleware:
         "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:89.0) Gecko/20100101 Firefox/89.0",
     ]
 
+    # Number of random picks drawn per refill of the User-Agent pool
+    UA_POOL_SIZE = 4096
+
+    __slots__ = ("logger", "_ua_pool", "_rng", "_ua_tuple")
+
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self._ua_pool = deque()
+        # A private generator avoids going through the shared module-level Random
+        self._rng = random.Random()
+        self._ua_tuple = tuple(self.user_agents)
 
     @classmethod
     def from_crawler(cls, crawler):
@@ -25,9 +38,11 @@ class UserAgentRotatorMiddleware:
 
     def process_request(self, request, spider):
         """Set a random User-Agent for each request."""
-        ua = random.choice(self.user_agents)
+        if not self._ua_pool:
+            self._ua_pool.extend(self._rng.choices(self._ua_tuple, k=self.UA_POOL_SIZE))
+        ua = self._ua_pool.popleft()
         request.headers["User-Agent"] = ua
-        self.logger.debug(f"Using User-Agent: {ua} for {request.url}")
+        self.logger.debug("Using User-Agent: %s for %s", ua, request.url)
         return None
 
 
@@ -35,25 +50,79 @@ class CustomRetryMiddleware(RetryMiddleware):
     """
     Custom retry middleware to handle failed requests (e.g., 403, 429).
     Works with ryans.com and respects AUTOTHROTTLE_ENABLED.
+    A 429 or 503 pushes back the whole download slot, not just the retried request: to Retry-After
+    when the server sends it, otherwise by doubling the slot delay. AutoThrottle only sees latency,
+    so without this a server that rate-limits with fast error responses would never slow the crawl.
+    Other statuses in RETRY_HTTP_CODES are retried by the inherited RetryMiddleware logic.
+    It replaces the stock RetryMiddleware, which is disabled in DOWNLOADER_MIDDLEWARES.
     """
 
     def __init__(self, settings):
         super().__init__(settings)
         self.logger = logging.getLogger(__name__)
+        self.crawler = None
+        self.max_slot_delay = settings.getfloat("AUTOTHROTTLE_MAX_DELAY", 60.0)
+        self.min_backoff_delay = settings.getfloat("AUTOTHROTTLE_START_DELAY", 1.0)
 
     @classmethod
     def from_crawler(cls, crawler):
-        return cls(crawler.settings)
+        middleware = cls(crawler.settings)
+        middleware.crawler = crawler
+        return middleware
 
     def process_response(self, request, response, spider):
-        """Retry on 403 or 429 status codes."""
+        """
+        Back off the slot on 429/503, then retry 403 or 429 status codes; defer everything else to RetryMiddleware.
+        The backoff happens before any retry is scheduled, so it applies to every attempt, not just the last.
+        """
+        if request.meta.get("dont_retry", False):
+            return response
+        if response.status in (429, 503):
+            self._delay_slot(request, self._get_retry_after(response))
         if response.status in [403, 429]:
             self.logger.warning(f"Received {response.status} for {request.url}. Retrying...")
             reason = response_status_message(response.status)
             return self._retry(request, reason, spider) or response
-        return response
+        return super().process_response(request, response, spider)
 
     def process_exception(self, request, exception, spider):
-        """Retry on network exceptions."""
+        """Retry on network exceptions (RETRY_EXCEPTIONS); others, like IgnoreRequest, pass through."""
+        if not isinstance(exception, self.exceptions_to_retry) or request.meta.get("dont_retry", False):
+            return None
         self.logger.warning(f"Exception {exception} for {request.url}. Retrying...")
         return self._retry(request, exception, spider)
+
+    def _get_retry_after(self, response):
+        """Returns the Retry-After header in seconds (delta-seconds or HTTP-date form), or None."""
+        value = response.headers.get(b"Retry-After")
+        if not value:
+            return None
+        value = value.decode("latin-1").strip()
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=UTC)
+        return max((retry_at - datetime.now(UTC)).total_seconds(), 0.0)
+
+    def _delay_slot(self, request, delay):
+        """
+        Raises the request's download slot delay to `delay` seconds, capped at AUTOTHROTTLE_MAX_DELAY.
+        With no delay (no usable Retry-After) the current slot delay is doubled, starting from AUTOTHROTTLE_START_DELAY.
+        """
+        if self.crawler is None or self.crawler.engine is None:
+            return
+        slot = self.crawler.engine.downloader.slots.get(request.meta.get("download_slot"))
+        if slot is None:
+            return
+        if delay is None:
+            delay = max(slot.delay * 2, self.min_backoff_delay)
+        new_delay = min(delay, self.max_slot_delay)
+        if new_delay > slot.delay:
+            self.logger.info(f"Backing off {delay:.0f}s for {request.url}; slot delay set to {new_delay:.1f}s")
+            slot.delay = new_delay
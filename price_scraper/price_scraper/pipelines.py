@@ -1,14 +1,23 @@
-import json
 import logging
 import os
+import queue
+import threading
 from datetime import datetime
 
+import orjson
+import scrapy
+import xxhash
 from itemadapter import ItemAdapter
 from scrapy.exceptions import DropItem
 
 
 class DropDuplicatesPipeline:
-    """Drops duplicate items seen within the same crawl run based on URL."""
+    """
+    Drops duplicate items seen within the same crawl run based on URL.
+    Keys are stored as 64-bit xxHash fingerprints rather than full strings.
+    """
+
+    __slots__ = ("keys_seen", "logger")
 
     DUPLICATE_KEY_FIELD_MAP = {
         "ryans_categories": "category_url",
@@ -25,28 +34,65 @@ class DropDuplicatesPipeline:
         key_field = self.DUPLICATE_KEY_FIELD_MAP.get(spider.name)
         if not key_field:
             # Default or skip check if spider not configured
-            self.logger.debug(f"Duplicate key field not configured for spider '{spider.name}'. Skipping check.")
+            self.logger.debug("Duplicate key field not configured for spider '%s'. Skipping check.", spider.name)
             return item
 
-        adapter = ItemAdapter(item)
-        key_value = adapter.get(key_field)
+        if isinstance(item, (dict, scrapy.Item)):
+            key_value = item.get(key_field)
+        else:
+            key_value = ItemAdapter(item).get(key_field)
 
         if not key_value:
             self.logger.warning(f"Item missing duplicate key field '{key_field}'...")
             return item
 
-        item_key_tuple = (key_field, key_value)
-
-        if item_key_tuple in self.keys_seen:
+        # The key field is fixed per spider, so the value alone identifies the item
+        fingerprint = xxhash.xxh3_64_intdigest(str(key_value).encode())
+        if fingerprint in self.keys_seen:
             drop_msg = f"Duplicate item found based on field '{key_field}': {key_value}"
             self.logger.warning(f"DROP DUPLICATE: {drop_msg}")
             # --- End Log ---
             raise DropItem(drop_msg)
         else:
-            self.keys_seen.add(item_key_tuple)
+            self.keys_seen.add(fingerprint)
             return item
 
 
+def _make_field_validator(essential_fields, important_fields):
+    """
+    Builds a validator for one spider's field lists.
+    The returned function takes a plain dict of the item's fields and returns (missing_essential, missing_important).
+    """
+    essential_fields = tuple(essential_fields)
+    important_fields = tuple((field, field == "specifications") for field in important_fields)
+    check_price = "price" in essential_fields
+
+    def validate(data):
+        # --- Check Essential Fields ---
+        missing_essential = [field for field in essential_fields if not data.get(field)]
+        if check_price:
+            price = data.get("price")
+            if price is None or price <= 0:
+                missing_essential.append("price (invalid/missing)")
+        if missing_essential:
+            return missing_essential, []
+
+        # --- Check Important (but not critical) Fields ---
+        missing_important = []
+        for field, is_specs in important_fields:
+            value = data.get(field)
+            if value is None:  # Check for None explicitly
+                missing_important.append(f"{field} (None)")
+            # Specific check for specifications dictionary
+            elif is_specs and not isinstance(value, dict):
+                missing_important.append(f"{field} (not dict)")
+            elif is_specs and not value:  # Check if dict is empty
+                missing_important.append(f"{field} (empty dict)")
+        return missing_essential, missing_important
+
+    return validate
+
+
 class RequiredFieldsPipeline:
     """
     Drops items missing essential fields. Warns about missing optional-but-important fields.
@@ -63,42 +109,38 @@ class RequiredFieldsPipeline:
         "startech_product_details": ["specifications"],
     }
 
+    __slots__ = ("logger", "_validate")
+
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self._validate = _make_field_validator([], [])
 
-    def process_item(self, item, spider):
-        essential_fields = self.ESSENTIAL_FIELDS_MAP.get(spider.name, [])
-        important_fields = self.IMPORTANT_FIELDS_MAP.get(spider.name, [])
-
-        adapter = ItemAdapter(item)
+    def open_spider(self, spider):
+        # The spider is fixed for the whole run, so resolve its field lists once
+        self._validate = _make_field_validator(
+            self.ESSENTIAL_FIELDS_MAP.get(spider.name, []),
+            self.IMPORTANT_FIELDS_MAP.get(spider.name, []),
+        )
 
-        # --- Check Essential Fields ---
-        missing_essential = [field for field in essential_fields if not adapter.get(field)]
-        if "price" in essential_fields and (adapter.get("price") is None or adapter["price"] <= 0):
-            missing_essential.append("price (invalid/missing)")
+    def process_item(self, item, spider):
+        # Snapshot the fields once so every check below is a plain dict lookup
+        if isinstance(item, (dict, scrapy.Item)):
+            data = dict(item)
+        else:
+            data = ItemAdapter(item).asdict()
+        missing_essential, missing_important = self._validate(data)
+        item_ref = data.get("url") or data.get("name", "N/A")
 
         if missing_essential:
-            msg = f"DROP: Missing essential fields: {', '.join(missing_essential)} in item from spider '{spider.name}' ({adapter.get('url') or adapter.get('name', 'N/A')})"
+            msg = f"DROP: Missing essential fields: {', '.join(missing_essential)} in item from spider '{spider.name}' ({item_ref})"
             self.logger.warning(msg)
             raise DropItem(msg)  # Drop items missing essential data
 
-        # --- Check Important (but not critical) Fields ---
-        missing_important = []
-        for field in important_fields:
-            value = adapter.get(field)
-            if value is None:  # Check for None explicitly
-                missing_important.append(f"{field} (None)")
-            # Specific check for specifications dictionary
-            elif field == "specifications" and not isinstance(value, dict):
-                missing_important.append(f"{field} (not dict)")
-            elif field == "specifications" and not value:  # Check if dict is empty
-                missing_important.append(f"{field} (empty dict)")
-
         if missing_important:
             # Log a warning but DO NOT drop the item
             self.logger.warning(
                 f"WARN: Missing important fields: {', '.join(missing_important)} in item from spider '{spider.name}' "
-                f"({adapter.get('url') or adapter.get('name', 'N/A')})"
+                f"({item_ref})"
             )
             # Ensure specifications field is None if it failed checks, helps downstream processing
             if (
@@ -106,7 +148,7 @@ class RequiredFieldsPipeline:
                 or "specifications (empty dict)" in missing_important
                 or "specifications (None)" in missing_important
             ):
-                adapter["specifications"] = None
+                ItemAdapter(item)["specifications"] = None
 
         return item  # Always return item after checks
 
@@ -115,13 +157,25 @@ class JsonLinesExportPipeline:
     """
     Pipeline to export collected items incrementally to a timestamped JSON Lines file.
     Handles directory creation, file opening/closing, and serialization.
+    Lines are collected in a byte buffer; each full buffer (WRITE_BUFFER_BYTES) is handed to a
+    dedicated writer thread, so disk writes never block the reactor thread.
     """
 
+    WRITE_BUFFER_BYTES = 256 * 1024
+    # Full buffers allowed to wait for the writer before process_item blocks (backpressure)
+    MAX_PENDING_WRITES = 16
+
+    __slots__ = ("logger", "file_handle", "filename", "items_written", "_buf", "_buf_items", "_queue", "_writer")
+
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.file_handle = None
         self.filename = None
         self.items_written = 0
+        self._buf = bytearray()
+        self._buf_items = 0
+        self._queue = queue.Queue(maxsize=self.MAX_PENDING_WRITES)
+        self._writer = None
 
     @classmethod
     def from_crawler(cls, crawler):
@@ -134,7 +188,9 @@ class JsonLinesExportPipeline:
             self.logger.error("Export directory could not be created/verified. Pipeline disabled.")
             return
         try:
-            self.file_handle = open(self.filename, "w", encoding="utf-8")
+            self.file_handle = open(self.filename, "wb")
+            self._writer = threading.Thread(target=self._write_batches, name="JsonLinesWriter", daemon=True)
+            self._writer.start()
             self.logger.info(f"JSON Lines export pipeline started. Writing to: {self.filename}")
         except OSError as e:
             self.logger.error(f"Could not open file {self.filename} for writing. Error: {e}")
@@ -143,22 +199,33 @@ class JsonLinesExportPipeline:
     def process_item(self, item, spider):
         if not item or not self.file_handle:
             if not self.file_handle and self.filename:
-                self.logger.warning(
-                    f"Export file '{self.filename}' not open. Skipping item: {ItemAdapter(item).get('url', 'N/A') if item else 'None'}"
-                )
+                if not item:
+                    item_url = "None"
+                elif isinstance(item, (dict, scrapy.Item)):
+                    item_url = item.get("url", "N/A")
+                else:
+                    item_url = ItemAdapter(item).get("url", "N/A")
+                self.logger.warning(f"Export file '{self.filename}' not open. Skipping item: {item_url}")
             return item
 
         json_string = self._serialize_item(item)
         if json_string is None:
             return item
 
-        if self._write_line(json_string):
-            self.items_written += 1
+        self._buf += json_string
+        self._buf_items += 1
+        if len(self._buf) >= self.WRITE_BUFFER_BYTES:
+            self._flush_buffer()
 
         return item
 
     def close_spider(self, spider):
         if self.file_handle:
+            self._flush_buffer()
+            # Let the writer drain everything queued before closing the file
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
             try:
                 self.file_handle.close()
                 self.logger.info(
@@ -171,10 +238,13 @@ class JsonLinesExportPipeline:
         self.file_handle = None
         self.filename = None
         self.items_written = 0
+        self._buf.clear()
+        self._buf_items = 0
 
     def _generate_filename(self, spider):
         output_dir = "output"
-        timestamp = datetime.now().strftime("%Y-%m-%d %I:%M:%S %p")
+        # No colons or spaces: the name must be valid on Windows too
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         return os.path.join(output_dir, f"{spider.name}_export_{timestamp}.jl")
 
     def _ensure_output_directory_exists(self, directory_path):
@@ -192,16 +262,34 @@ class JsonLinesExportPipeline:
 
     def _serialize_item(self, item):
         try:
-            item_dict = ItemAdapter(item).asdict()
-            return json.dumps(item_dict)
-        except TypeError as e:
+            # Our items are flat scrapy.Items (specifications is already a plain dict), so a shallow copy suffices
+            if isinstance(item, scrapy.Item):
+                item_dict = dict(item)
+            else:
+                item_dict = ItemAdapter(item).asdict()
+            # The line comes back already newline-terminated, ready to append to the buffer
+            return orjson.dumps(item_dict, option=orjson.OPT_APPEND_NEWLINE)
+        except orjson.JSONEncodeError as e:
             self.logger.error(f"Failed to serialize item to JSON: {e}. Item: {item}")
             return None
 
-    def _write_line(self, line):
-        try:
-            self.file_handle.write(line + "\n")
-            return True
-        except OSError as e:
-            self.logger.error(f"Failed to write line to file {self.filename}: {e}. Line: {line[:100]}...")
-            return False
+    def _flush_buffer(self):
+        """Hands the buffered lines to the writer thread and starts a new buffer."""
+        if not self._buf:
+            return
+        self._queue.put((self._buf, self._buf_items))
+        self._buf = bytearray()
+        self._buf_items = 0
+
+    def _write_batches(self):
+        """Writer thread: writes queued buffers in order until it receives the None sentinel."""
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            data, line_count = batch
+            try:
+                self.file_handle.write(data)
+                self.items_written += line_count
+            except OSError as e:
+                self.logger.error(f"Failed to write {line_count} lines to file {self.filename}: {e}")
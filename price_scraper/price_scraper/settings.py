@@ -1,38 +1,5 @@
-import copy
-
-import scrapy.utils.log
-from colorlog import ColoredFormatter
-
-# --- Logging Configuration ---
-_color_formatter = ColoredFormatter(
-    (
-        "%(log_color)s%(levelname)-8s%(reset)s "
-        "%(yellow)s[%(asctime)s]%(reset)s"
-        "%(white)s %(name)s %(funcName)s %(bold_purple)s:%(lineno)d%(reset)s "
-        "%(log_color)s%(message)s%(reset)s"
-    ),
-    datefmt="%d-%m-%y %H:%M:%S",
-    log_colors={
-        "DEBUG": "cyan",
-        "INFO": "green",
-        "WARNING": "yellow",
-        "ERROR": "bold_red",
-        "CRITICAL": "red,bg_white",
-    },
-)
-_get_handler = copy.copy(scrapy.utils.log._get_handler)
-
-
-def _get_handler_custom(*args, **kwargs):
-    handler = _get_handler(*args, **kwargs)
-    if handler:
-        handler.setFormatter(_color_formatter)
-    return handler
-
-
-scrapy.utils.log._get_handler = _get_handler_custom
-# --- End Logging Configuration ---
-
+import importlib.util
+import os
 
 # --- Project Identification ---
 BOT_NAME = "price_scraper"  # Project name
@@ -43,7 +10,7 @@ NEWSPIDER_MODULE = "price_scraper.spiders"
 
 # --- Core Scrapy Settings ---
 ROBOTSTXT_OBEY = True
-LOG_LEVEL = "DEBUG"
+LOG_LEVEL = os.environ.get("SCRAPY_LOG_LEVEL", "INFO")  # Set SCRAPY_LOG_LEVEL=DEBUG when developing
 LOG_ENABLED = True
 # Define the log file path
 # LOG_FILE = "output/scrapy_run.log"  # Log file will be in the 'output' directory
@@ -56,6 +23,11 @@ LOG_ENABLED = True
 # LOG_DATEFORMAT = "%Y-%m-%d %H:%M:%S"  # Consistent date format
 COOKIES_ENABLED = False
 TELNETCONSOLE_ENABLED = False
+
+TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
+# Use the libuv-based uvloop event loop when it is installed (it is not available on Windows)
+if importlib.util.find_spec("uvloop") is not None:
+    ASYNCIO_EVENT_LOOP = "uvloop.Loop"
 # --- End Core Scrapy Settings ---
 
 
@@ -64,18 +36,30 @@ CONCURRENT_REQUESTS = 32
 CONCURRENT_REQUESTS_PER_DOMAIN = 16
 
 AUTOTHROTTLE_ENABLED = True
-AUTOTHROTTLE_START_DELAY = 5.0
+AUTOTHROTTLE_START_DELAY = 1.0  # AutoThrottle raises the delay itself if the server slows down
 AUTOTHROTTLE_TARGET_CONCURRENCY = 8.0
 AUTOTHROTTLE_MAX_DELAY = 60.0
+
+# Retries run only through CustomRetryMiddleware (the stock RetryMiddleware is disabled below), which
+# also backs off the download slot on 429/503
+RETRY_ENABLED = True
 # --- End Concurrency and Throttling ---
 
 
+# --- HTTP Compression ---
+# Pinned explicitly: product pages are 100-300 KB of HTML and compress several times over.
+# Brotli ("br") is only advertised in Accept-Encoding when the brotli package is installed.
+HTTPCOMPRESSION_ENABLED = True
+# --- End HTTP Compression ---
+
+
 # --- HTTP Cache (Development Only!) ---
-HTTPCACHE_ENABLED = True
+HTTPCACHE_ENABLED = os.environ.get("SCRAPY_CACHE", "0") == "1"  # Opt in with SCRAPY_CACHE=1
 HTTPCACHE_DIR = "httpcache"
 HTTPCACHE_IGNORE_HTTP_CODES = [500, 502, 503, 504, 522, 524, 408, 429]
-HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
-HTTPCACHE_EXPIRATION_SECS = 0
+# One DBM file per spider instead of one directory of files per request
+HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.DbmCacheStorage"
+HTTPCACHE_EXPIRATION_SECS = 3600  # Refetch entries older than an hour instead of replaying them forever
 # --- End HTTP Cache ---
 
 
@@ -84,6 +68,8 @@ DOWNLOADER_MIDDLEWARES = {
     "price_scraper.middlewares.UserAgentRotatorMiddleware": 450,
     "scrapy.downloadermiddlewares.useragent.UserAgentMiddleware": None,
     "price_scraper.middlewares.CustomRetryMiddleware": 540,
+    # CustomRetryMiddleware subclasses the stock one; running both would retry every response twice
+    "scrapy.downloadermiddlewares.retry.RetryMiddleware": None,
     "scrapy.downloadermiddlewares.httpcache.HttpCacheMiddleware": 900,
 }
 
@@ -99,9 +85,20 @@ ITEM_PIPELINES = {
 # --- End Item Pipelines ---
 
 
+# --- Feed Exporters ---
+# Category spiders write their output via FEEDS; serialize those lines with orjson too
+FEED_EXPORTERS = {
+    "jsonlines": "price_scraper.exporters.OrjsonLinesExporter",
+}
+# --- End Feed Exporters ---
+
+
 # --- Extension Configuration ---
 EXTENSIONS = {
     "price_scraper.extensions.runtime_extension.RuntimeLogger": 500,
+    # Colorizes console logs; files and pipes stay plain
+    "price_scraper.extensions.color_logging.ColorLogging": 0,
 }
 RUNTIME_LOGGER_ENABLED = True
+COLOR_LOGGING_ENABLED = True
 # --- End Extension Configuration ---
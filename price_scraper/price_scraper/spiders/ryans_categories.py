@@ -1,11 +1,14 @@
 import logging
-from urllib.parse import urlparse
+import re
 
 import scrapy
-from itemadapter import ItemAdapter
-from scrapy.loader import ItemLoader
+import xxhash
 
-from ..items import CategoryItem
+from ..items import CategoryItem, clean_html_text
+from ..utils import compile_css, make_urljoin
+
+# Matches URLs whose path is "" or "/" (site roots), splitting scheme/authority/path the way urlparse does
+_ROOT_URL_RE = re.compile(r"(?:[A-Za-z][A-Za-z0-9+.-]*:)?(?://[^/?#]*)?/?(?:[?#]|$)")
 
 
 class RyansCategoriesSpider(scrapy.Spider):
@@ -18,7 +21,14 @@ class RyansCategoriesSpider(scrapy.Spider):
     name = "ryans_categories"
     allowed_domains = ["ryans.com"]
     start_urls = ["https://www.ryans.com/"]
-    ignored_paths = {"/", ""}
+
+    # Menu links and their text, compiled once and evaluated straight on the lxml tree
+    _XP_CATEGORY_LINKS = compile_css(
+        "nav#navbar_main div.col-megamenu a[href], "
+        "nav#navbar_main ul.dropdown-menu2 a[href], "
+        "nav#navbar_main li.hover_drop_down > a.dropdown-toggle[href]"
+    )
+    _XP_TEXT = compile_css("::text")
 
     custom_settings = {
         "FEEDS": {
@@ -31,7 +41,8 @@ class RyansCategoriesSpider(scrapy.Spider):
         },
         "ITEM_PIPELINES": {
             "price_scraper.pipelines.JsonLinesExportPipeline": None,
-            "price_scraper.pipelines.DropDuplicatesPipeline": 100,
+            # parse() already dedups by URL via seen_urls, so skip the pipeline's second check
+            "price_scraper.pipelines.DropDuplicatesPipeline": None,
         },
     }
 
@@ -47,44 +58,39 @@ class RyansCategoriesSpider(scrapy.Spider):
         """
         self.logger.info(f"Starting category extraction from {response.url}")
 
-        category_links_selector = (
-            "nav#navbar_main div.col-megamenu a[href], "
-            "nav#navbar_main ul.dropdown-menu2 a[href], "
-            "nav#navbar_main li.hover_drop_down > a.dropdown-toggle[href]"
-        )
+        seen_urls = set()  # 64-bit xxHash fingerprints of the yielded URLs
 
-        seen_urls = set()
+        links = self._XP_CATEGORY_LINKS(response.selector.root)
+        self.logger.info(f"Found {len(links)} potential category link elements.")
 
-        link_selectors = response.css(category_links_selector)
-        self.logger.info(f"Found {len(link_selectors)} potential category link elements.")
-
-        for link_selector in link_selectors:
-            loader = ItemLoader(item=CategoryItem(), selector=link_selector, response=response)
-            relative_url = link_selector.css("::attr(href)").get()
+        urljoin = make_urljoin(response)
+        for link in links:
+            relative_url = link.get("href")
 
             if not relative_url or relative_url.strip() == "#":
                 continue
 
-            absolute_url = response.urljoin(relative_url)
-            parsed_url = urlparse(absolute_url)
+            absolute_url = urljoin(relative_url)
 
-            if absolute_url in seen_urls or parsed_url.path in self.ignored_paths or absolute_url == response.url:
+            # Hash once; links back to the homepage (any site root) are skipped without parsing the URL
+            url_fingerprint = xxhash.xxh3_64_intdigest(absolute_url.encode())
+            if url_fingerprint in seen_urls or absolute_url == response.url or _ROOT_URL_RE.match(absolute_url):
                 continue
 
-            loader.add_css("category_name", "::text")
-            loader.add_value("category_url", absolute_url)
-
-            item = loader.load_item()
+            # Build the item directly; an ItemLoader per link is pure overhead for two fields.
+            # Like the loader's TakeFirst, the name is the first text node that is non-empty after cleaning.
+            raw_texts = self._XP_TEXT(link)
+            category_name = next(filter(None, map(clean_html_text, raw_texts)), None)
 
-            adapter = ItemAdapter(item)
-            if adapter.get("category_name") and adapter.get("category_url"):
-                seen_urls.add(absolute_url)
-                self.logger.debug(f"Yielding Category: '{adapter['category_name']}' -> {adapter['category_url']}")
-                yield item
+            if category_name:
+                seen_urls.add(url_fingerprint)
+                self.logger.debug("Yielding Category: '%s' -> %s", category_name, absolute_url)
+                yield CategoryItem(category_name=category_name, category_url=absolute_url)
             else:
                 self.logger.debug(
-                    f"Item dropped post-processing (missing name/url): "
-                    f"URL='{absolute_url}', Raw Name='{link_selector.css('::text').get()}'"
+                    "Item dropped post-processing (missing name/url): URL='%s', Raw Name='%s'",
+                    absolute_url,
+                    raw_texts[0] if raw_texts else None,
                 )
 
         self.logger.info(f"Finished category extraction. Yielded {len(seen_urls)} unique category items.")
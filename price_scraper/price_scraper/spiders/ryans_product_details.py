@@ -1,10 +1,16 @@
 import scrapy
-import json
 import logging
+import sys
+from collections import defaultdict
 from pathlib import Path
+
+import orjson
+from lxml import etree
+from parsel.csstranslator import css2xpath
 from scrapy.loader import ItemLoader
 
 from ..items import RyansProductDetailItem, clean_text  # Import only necessary functions
+from ..utils import compile_css, make_urljoin
 
 
 class RyansProductDetailsSpider(scrapy.Spider):
@@ -17,6 +23,52 @@ class RyansProductDetailsSpider(scrapy.Spider):
     allowed_domains = ["ryans.com"]
     category_file = Path(__file__).resolve().parents[2] / "output/ryans_categories.jl"
 
+    # Product pages all come from one host, so multiplex them over a single HTTP/2 connection.
+    # This replaces HTTP/1.1 keep-alive pooling (one TCP+TLS setup per pooled connection) rather than adding to it.
+    custom_settings = {
+        "DOWNLOAD_HANDLERS": {"https": "scrapy.core.downloader.handlers.http2.H2DownloadHandler"},
+        # Everything goes to one host, so the per-domain cap can match the global one
+        "CONCURRENT_REQUESTS": 32,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 32,
+        "DOWNLOAD_DELAY": 0,
+        "AUTOTHROTTLE_ENABLED": True,
+        "AUTOTHROTTLE_TARGET_CONCURRENCY": 16.0,
+        "RETRY_HTTP_CODES": [500, 502, 503, 504, 522, 524, 408, 429],
+    }
+
+    # --- Category page selectors, compiled once instead of on every listing page ---
+    _XP_PRODUCT_LINKS = compile_css("div.card.h-100 p.list-view-text a::attr(href)")
+    _XP_NEXT_PAGE = compile_css('ul.pagination li.page-item a[rel="next"]::attr(href)')
+
+    # --- Product page selectors, compiled once instead of on every response ---
+    # Fields filled straight from one XPath each, in output order
+    _FIELD_XPATHS = (
+        ("name", compile_css('h1[itemprop="name"]::text')),
+        ("price", compile_css('meta[itemprop="price"]::attr(content)')),
+        ("regular_price", compile_css("div.new-reg-price-block span.new-reg-text::text")),
+        ("brand", compile_css('div[itemprop="brand"] span[itemprop="name"]::text')),
+        ("sku", compile_css('meta[itemprop="sku"]::attr(content)')),
+        ("key_features", compile_css("div.overview ul.category-info li.context::text")),
+        ("image_urls", compile_css("div#slideshow-items-container img.slideshow-items::attr(src)")),
+    )
+    # Same match as the former :contains() CSS query, but evaluated as a single boolean XPath
+    _XP_OUT_OF_STOCK = etree.XPath(
+        "boolean(" + css2xpath('div.price-block span.stock-text:contains("Out Of Stock")') + ")"
+    )
+    _XP_DESCRIPTION = compile_css("div.spec-details div.card-body.details-tab")
+    _XP_SPEC_CONTAINER = compile_css("div#add-spec-div")
+    _XP_BASIC_SPEC_CONTAINER = compile_css("div#basic-spec-div")
+    _XP_TABLE_SPEC_CONTAINER = compile_css("div.specification-table div.grid-container")
+    _XP_TEXT = compile_css("::text")
+    # Heading of the nearest section wrapping a spec container (the container may itself be that section)
+    _XP_CONTAINER_HEADING_TEXT = etree.XPath(
+        'ancestor-or-self::div[contains(@class, "justify-content-center")][1]'
+        '/div[contains(@class, "col-lg-2")]/div/h6/text()',
+        smart_strings=False,
+    )
+    _SPEC_ROW_CLASSES = frozenset(("row", "table-hr-remove"))
+    _SPEC_CELL_CLASSES = frozenset(("att-title", "att-value"))
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -33,19 +85,23 @@ class RyansProductDetailsSpider(scrapy.Spider):
         return spider
 
     def start_requests(self):
-        """Reads category URLs from file and yields initial requests."""
+        """
+        Reads category URLs from file and yields initial requests.
+        The file is read line by line as Scrapy pulls requests from this generator, so the first
+        request is scheduled as soon as the first line is parsed rather than after the whole file.
+        """
         if not self.category_file.is_file():
             self.logger.error(f"Category file not found: {self.category_file}")
             return
 
         self.logger.info(f"Reading categories from: {self.category_file}")
-        processed_urls = set()
 
         try:
-            with open(self.category_file, "r", encoding="utf-8") as f:
+            # orjson parses the raw bytes directly and tolerates the trailing newline
+            with open(self.category_file, "rb") as f:
                 for line_num, line in enumerate(f, 1):
                     try:
-                        cat_data = json.loads(line.strip())
+                        cat_data = orjson.loads(line)
                         cat_url = cat_data.get("category_url")
                         cat_name = cat_data.get("category_name", f"Unknown Category Line {line_num}")
 
@@ -54,24 +110,23 @@ class RyansProductDetailsSpider(scrapy.Spider):
                             or not isinstance(cat_url, str)
                             or not cat_url.startswith("https://www.ryans.com/category/")
                         ):
-                            self.logger.warning(f"Skipping invalid category entry on line {line_num}: {line.strip()}")
+                            self.logger.warning(f"Skipping invalid category entry on line {line_num}: {line.strip()!r}")
                             continue
 
-                        if cat_url not in processed_urls:
-                            processed_urls.add(cat_url)
-                            self.logger.debug(f"Yielding category request for: {cat_name} - {cat_url}")
-                            yield scrapy.Request(
-                                url=cat_url,
-                                callback=self.parse_category,
-                                errback=self.handle_error,
-                                meta={"category_name": cat_name},
-                            )
+                        # Repeated category URLs are dropped by the scheduler's dupefilter
+                        self.logger.debug("Yielding category request for: %s - %s", cat_name, cat_url)
+                        yield scrapy.Request(
+                            url=cat_url,
+                            callback=self.parse_category,
+                            errback=self.handle_error,
+                            meta={"category_name": cat_name},
+                        )
                     # (Keep error handling for file reading)
-                    except json.JSONDecodeError:
-                        self.logger.error(f"Failed to decode JSON on line {line_num}: {line.strip()}")
+                    except orjson.JSONDecodeError:
+                        self.logger.error(f"Failed to decode JSON on line {line_num}: {line.strip()!r}")
                     except Exception as e:
                         self.logger.error(
-                            f"Error processing category line {line_num} ('{line.strip()}'): {e}", exc_info=True
+                            f"Error processing category line {line_num} ('{line.strip()!r}'): {e}", exc_info=True
                         )
         except FileNotFoundError:
             self.logger.error(f"Category file not found during open: {self.category_file}")
@@ -86,14 +141,16 @@ class RyansProductDetailsSpider(scrapy.Spider):
         category_name = response.meta.get("category_name", "Unknown Category")
         self.logger.info(f"Scanning category: '{category_name}' from {response.url}")
 
-        product_links = response.css("div.card.h-100 p.list-view-text a::attr(href)").getall()
+        root = response.selector.root
+        product_links = self._XP_PRODUCT_LINKS(root)
         if not product_links:
             self.logger.warning(f"No product links found on category page {response.url}")
 
+        urljoin = make_urljoin(response)
         for product_link in product_links:
             # No limit check needed
-            absolute_product_url = response.urljoin(product_link)
-            self.logger.debug(f"Yielding product request for: {absolute_product_url}")
+            absolute_product_url = urljoin(product_link)
+            self.logger.debug("Yielding product request for: %s", absolute_product_url)
             yield scrapy.Request(
                 url=absolute_product_url,
                 callback=self.parse_product_detail,
@@ -102,10 +159,11 @@ class RyansProductDetailsSpider(scrapy.Spider):
             )
 
         # --- Handle Pagination ---
-        next_page = response.css('ul.pagination li.page-item a[rel="next"]::attr(href)').get()
+        next_pages = self._XP_NEXT_PAGE(root)
+        next_page = next_pages[0] if next_pages else None
         # No limit check needed
         if next_page:
-            self.logger.debug(f"Following pagination link: {next_page}")
+            self.logger.debug("Following pagination link: %s", next_page)
             yield response.follow(
                 next_page, callback=self.parse_category, errback=self.handle_error, meta=response.meta
             )
@@ -122,85 +180,52 @@ class RyansProductDetailsSpider(scrapy.Spider):
         category_name = response.meta.get("category_name", "Unknown Category")
 
         loader = ItemLoader(item=RyansProductDetailItem(), response=response)
+        root = response.selector.root
 
-        # --- Populate Loader (Selectors remain the same) ---
-        loader.add_css("name", 'h1[itemprop="name"]::text')
+        # --- Populate Loader (precompiled selectors evaluated on the lxml tree) ---
         loader.add_value("url", response.url)
         loader.add_value("category", category_name)
-        loader.add_css("price", 'meta[itemprop="price"]::attr(content)')
-        loader.add_css("regular_price", "div.new-reg-price-block span.new-reg-text::text")
-        loader.add_css("brand", 'div[itemprop="brand"] span[itemprop="name"]::text')
-        loader.add_css("sku", 'meta[itemprop="sku"]::attr(content)')
+        for field_name, field_xpath in self._FIELD_XPATHS:
+            loader.add_value(field_name, field_xpath(root))
 
         # Availability (Simplified logic remains)
-        out_of_stock_text = response.css('div.price-block span.stock-text:contains("Out Of Stock")').get()
-        if out_of_stock_text:
+        if self._XP_OUT_OF_STOCK(root):
             loader.add_value("availability", "Out of Stock")
         else:
             loader.add_value("availability", "In Stock")
 
-        loader.add_css("key_features", "div.overview ul.category-info li.context::text")
-        loader.add_css("image_urls", "div#slideshow-items-container img.slideshow-items::attr(src)")
-
         # --- Description Section ---
-        description_html_content = response.css("div.spec-details div.card-body.details-tab").get()
-        if description_html_content:
+        description_elements = self._XP_DESCRIPTION(root)
+        if description_elements:
+            description_html_content = etree.tostring(
+                description_elements[0], method="html", encoding="unicode", with_tail=False
+            )
             loader.add_value("description_html", description_html_content)
         else:
-            self.logger.debug(f"No description section ('div.spec-details') found on {response.url}")
+            self.logger.debug("No description section ('div.spec-details') found on %s", response.url)
 
         # --- Parse Specifications (Updated Logic) ---
-        specs = {}
-        spec_rows = []  # Initialize as empty list
+        specs = None  # Stays None until a container with spec rows is found
 
         # --- Check Known Container Selectors in Order of Preference/Likelihood ---
         # 1. Try the hidden div structure (likely most common for complex products)
-        container_selector_1 = response.css("div#add-spec-div")
-        if container_selector_1:
-            spec_rows = container_selector_1.css("div.row.table-hr-remove")
+        container_1 = self._XP_SPEC_CONTAINER(root)
+        if container_1:
+            specs = self._extract_specs(container_1)
             # Fallback within this structure if add-spec-div has no rows
-            if not spec_rows:
-                basic_container = response.css("div#basic-spec-div")
+            if specs is None:
+                basic_container = self._XP_BASIC_SPEC_CONTAINER(root)
                 if basic_container:
-                    spec_rows = basic_container.css("div.row.table-hr-remove")
-            self.logger.debug(f"Found specs using #add-spec-div/#basic-spec-div on {response.url}")
+                    specs = self._extract_specs(basic_container)
+            self.logger.debug("Found specs using #add-spec-div/#basic-spec-div on %s", response.url)
 
         # 2. If the first structure wasn't found OR yielded no rows, try the alternative table structure
-        if not spec_rows:
-            container_selector_2 = response.css("div.specification-table div.grid-container")  # Target the inner grid
-            if container_selector_2:
+        if specs is None:
+            container_2 = self._XP_TABLE_SPEC_CONTAINER(root)  # Target the inner grid
+            if container_2:
                 # The rows seem to be nested differently here
-                spec_rows = container_selector_2.css("div.row.table-hr-remove")
-                self.logger.debug(f"Found specs using div.specification-table structure on {response.url}")
-
-        # --- Process the found rows (if any) ---
-        if spec_rows:
-            current_section = "General"  # Default/Fallback section name
-            for row in spec_rows:
-                # Check for section heading first within this row's structure
-                # The heading is in a parent div: row justify-content-center
-                heading_div = row.xpath(
-                    './ancestor::div[contains(@class, "justify-content-center")][1]/div[contains(@class, "col-lg-2")]/div/h6'
-                )
-                if heading_div:
-                    heading_text = heading_div.css("::text").get()
-                    if heading_text:
-                        current_section = clean_text(heading_text)
-                        if current_section not in specs:
-                            specs[current_section] = {}  # Initialize section if new
-
-                # Extract key/value (same logic as before)
-                key_list = row.css("span.att-title::text").getall()
-                value_list = row.css("span.att-value::text").getall()
-                key = clean_text(" ".join(key_list)) if key_list else None
-                value = clean_text(" ".join(value_list)) if value_list else None
-
-                if key and value:
-                    # Ensure the section exists before adding
-                    if current_section not in specs:
-                        specs[current_section] = {}
-                    specs[current_section][key] = value
-        # --- End Processing ---
+                specs = self._extract_specs(container_2)
+                self.logger.debug("Found specs using div.specification-table structure on %s", response.url)
 
         if specs:
             loader.add_value("specifications", specs)
@@ -212,6 +237,82 @@ class RyansProductDetailsSpider(scrapy.Spider):
 
         yield loader.load_item()
 
+    def _is_spec_heading(self, h6, container):
+        """True for the h6 of a "row justify-content-center" section (h6 < div < div.col-lg-2 < div)."""
+        wrapper = h6.getparent()
+        column = wrapper.getparent() if wrapper is not None else None
+        section = column.getparent() if column is not None else None
+        return (
+            section is not None
+            and section is not container
+            and wrapper.tag == "div"
+            and column.tag == "div"
+            and section.tag == "div"
+            and "col-lg-2" in column.get("class", "")
+            and "justify-content-center" in section.get("class", "")
+        )
+
+    def _extract_specs(self, containers):
+        """
+        Builds the {section: {key: value}} specs dict from the given spec containers in one walk per container.
+        Headings precede their section's rows, so each row belongs to the most recent heading.
+        Returns None if the containers hold no spec rows at all.
+        """
+        specs = defaultdict(dict)
+        found_rows = False
+        current_section = "General"  # Default/Fallback section name
+        section_started = False
+        open_rows = []  # [key_parts, value_parts] for each spec row currently being walked
+
+        for container in containers:
+            # The walk only sees headings inside the container; a section wrapping it has its heading outside
+            heading_texts = self._XP_CONTAINER_HEADING_TEXT(container)
+            if heading_texts and heading_texts[0]:
+                current_section = clean_text(heading_texts[0])
+                section_started = True
+
+            for event, el in etree.iterwalk(container, events=("start", "end"), tag=("h6", "div", "span")):
+                tag = el.tag
+                if tag == "div":
+                    if not self._SPEC_ROW_CLASSES.issubset(el.get("class", "").split()):
+                        continue
+                    if event == "start":
+                        found_rows = True
+                        open_rows.append(([], []))
+                        if section_started:
+                            specs.setdefault(current_section, {})  # Initialize section if new
+                            section_started = False
+                        continue
+
+                    key_list, value_list = open_rows.pop()
+                    key = clean_text(" ".join(key_list)) if key_list else None
+                    value = clean_text(" ".join(value_list)) if value_list else None
+                    if key and value:
+                        # Spec keys repeat across every product, so intern them to share one string object
+                        specs[current_section][sys.intern(key)] = value
+
+                elif event == "end":
+                    continue
+
+                elif tag == "h6":
+                    if self._is_spec_heading(el, container):
+                        heading_texts = self._XP_TEXT(el)
+                        if heading_texts and heading_texts[0]:
+                            current_section = clean_text(heading_texts[0])
+                            section_started = True
+
+                elif open_rows:
+                    # Title/value spans: keep only their own text nodes, so nested markup is skipped
+                    classes = self._SPEC_CELL_CLASSES.intersection(el.get("class", "").split())
+                    if classes:
+                        key_list, value_list = open_rows[-1]
+                        target = key_list if "att-title" in classes else value_list
+                        if el.text is not None:
+                            target.append(el.text)
+                        target.extend(child.tail for child in el if child.tail is not None)
+
+        return dict(specs) if found_rows else None
+
     def handle_error(self, failure):
         """Logs errors during request processing."""
         self.logger.error(
@@ -1,10 +1,12 @@
 import logging
 
 import scrapy
-from itemadapter import ItemAdapter
-from scrapy.loader import ItemLoader
+import xxhash
+from lxml import etree
+from parsel.csstranslator import css2xpath
 
-from ..items import CategoryItem
+from ..items import CategoryItem, clean_html_text
+from ..utils import compile_css, make_urljoin
 
 
 class StartechCategoriesSpider(scrapy.Spider):
@@ -17,6 +19,13 @@ class StartechCategoriesSpider(scrapy.Spider):
     allowed_domains = ["startech.com.bd"]
     start_urls = ["https://www.startech.com.bd/"]
 
+    # Anchors under each nav link's parent (same path as the former .css().xpath() chain),
+    # compiled once and evaluated straight on the lxml tree
+    _XP_CATEGORY_LINKS = etree.XPath(
+        css2xpath("nav#main-nav ul a.nav-link[href]") + "/parent::*[not(self::see-all)]/a", smart_strings=False
+    )
+    _XP_TEXT = compile_css("::text")
+
     custom_settings = {
         "FEEDS": {
             "output/startech_categories.jl": {
@@ -28,7 +37,8 @@ class StartechCategoriesSpider(scrapy.Spider):
         },
         "ITEM_PIPELINES": {
             "price_scraper.pipelines.JsonLinesExportPipeline": None,
-            "price_scraper.pipelines.DropDuplicatesPipeline": 100,
+            # parse() already dedups by URL via seen_urls, so skip the pipeline's second check
+            "price_scraper.pipelines.DropDuplicatesPipeline": None,
         },
     }
 
@@ -44,38 +54,31 @@ class StartechCategoriesSpider(scrapy.Spider):
         """
         self.logger.info(f"Starting Startech category extraction from {response.url}")
 
-        category_links_selector = "nav#main-nav ul a.nav-link[href]"
-        exclude_selector = "a.see-all"
-
-        seen_urls = set()
-        link_selectors = response.css(category_links_selector).xpath(
-            f"./parent::*[not(self::{exclude_selector.replace('a.', '')})]/a"
-        )
+        seen_urls = set()  # 64-bit xxHash fingerprints of the yielded URLs
+        links = self._XP_CATEGORY_LINKS(response.selector.root)
 
-        self.logger.info(f"Found {len(link_selectors)} potential category link elements using selector.")
+        self.logger.info(f"Found {len(links)} potential category link elements using selector.")
 
-        for link_selector in link_selectors:
-            loader = ItemLoader(item=CategoryItem(), selector=link_selector, response=response)
-
-            relative_url = link_selector.css("::attr(href)").get()
+        urljoin = make_urljoin(response)
+        for link in links:
+            relative_url = link.get("href")
             if not relative_url or relative_url.strip() == "#":
                 continue
 
-            absolute_url = response.urljoin(relative_url)
+            absolute_url = urljoin(relative_url)
 
-            if absolute_url in seen_urls:
+            url_fingerprint = xxhash.xxh3_64_intdigest(absolute_url.encode())
+            if url_fingerprint in seen_urls:
                 continue
 
-            loader.add_css("category_name", "::text")
-            loader.add_value("category_url", absolute_url)
-
-            item = loader.load_item()
-            adapter = ItemAdapter(item)
+            # Build the item directly, as in RyansCategoriesSpider: the name is the first text node
+            # that is non-empty after cleaning, matching the loader's MapCompose + TakeFirst.
+            category_name = next(filter(None, map(clean_html_text, self._XP_TEXT(link))), None)
 
-            if adapter.get("category_name") and adapter.get("category_url"):
-                seen_urls.add(absolute_url)
-                self.logger.debug(f"Yielding Category: '{adapter['category_name']}' -> {adapter['category_url']}")
-                yield item
+            if category_name:
+                seen_urls.add(url_fingerprint)
+                self.logger.debug("Yielding Category: '%s' -> %s", category_name, absolute_url)
+                yield CategoryItem(category_name=category_name, category_url=absolute_url)
 
         self.logger.info(f"Finished Startech category extraction. Yielded {len(seen_urls)} unique category items.")
 
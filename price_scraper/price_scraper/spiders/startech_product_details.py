@@ -1,10 +1,23 @@
 import scrapy
-import json  # For reading category file
 import logging
+from collections import defaultdict
 from pathlib import Path
-from scrapy.loader import ItemLoader
 
-from ..items import StartechProductDetailItem, clean_text
+import orjson
+import xxhash
+from lxml import etree
+from w3lib.url import canonicalize_url
+
+from ..items import StartechProductDetailItem, clean_html_text, clean_html_whitespace, clean_text, parse_price
+from ..utils import compile_css, make_urljoin
+
+
+def _first(values):
+    """Returns the first value that is neither None nor '' (what the loader's TakeFirst kept), else None."""
+    for value in values:
+        if value is not None and value != "":
+            return value
+    return None
 
 
 class StartechProductDetailsSpider(scrapy.Spider):
@@ -18,6 +31,33 @@ class StartechProductDetailsSpider(scrapy.Spider):
     allowed_domains = ["startech.com.bd"]
     category_file = Path(__file__).resolve().parents[2] / "output/startech_categories.jl"
 
+    # Product pages all come from one host, so multiplex them over a single HTTP/2 connection.
+    # This replaces HTTP/1.1 keep-alive pooling (one TCP+TLS setup per pooled connection) rather than adding to it.
+    custom_settings = {
+        "DOWNLOAD_HANDLERS": {"https": "scrapy.core.downloader.handlers.http2.H2DownloadHandler"},
+        # Everything goes to one host, so the per-domain cap can match the global one
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 32,
+    }
+
+    # --- Category page selectors, compiled once instead of on every response ---
+    _XP_PRODUCT_LINKS = compile_css("div.p-item div.p-item-details h4.p-item-name a::attr(href)")
+    _XP_NEXT_PAGE = compile_css('ul.pagination li a:contains("NEXT")::attr(href)')
+
+    # --- Product page selectors ---
+    _XP_NAME = compile_css("h1.product-name::text")
+    # Price is tried on the main price cell first, then on its <ins> (discounted) element
+    _XP_PRICE = compile_css("td.product-price::text")
+    _XP_PRICE_INS = compile_css("td.product-price ins::text")
+    _XP_REGULAR_PRICE = compile_css("td.product-regular-price::text")
+    _XP_PRODUCT_CODE = compile_css("td.product-code::text")
+    _XP_BRAND = compile_css("td.product-brand::text")
+    _XP_AVAILABILITY = compile_css("td.product-status::text")
+    _XP_KEY_FEATURES = compile_css("div.short-description ul li:not(.view-more)::text")
+    _XP_IMAGE_URLS = compile_css('meta[itemprop="image"]::attr(content)')
+    _XP_DESCRIPTION = compile_css("section#description div.full-description")
+    _XP_SPEC_TABLE_PARTS = compile_css("section#specification table.data-table > *")
+    _XP_SPEC_HEADING = compile_css("td.heading-row::text")
+
     def __init__(self, *args, **kwargs):
         """Initialize spider state."""
         super().__init__(*args, **kwargs)
@@ -43,41 +83,44 @@ class StartechProductDetailsSpider(scrapy.Spider):
             return  # Stop spider if input file is missing
 
         self.logger.info(f"Reading Startech categories from: {self.category_file}")
-        processed_urls = set()  # Optional: track if category file has duplicates
+        processed_urls = set()  # 64-bit xxHash fingerprints of canonicalized category URLs
 
         try:
-            with open(self.category_file, "r", encoding="utf-8") as f:
-                for line_num, line in enumerate(f, 1):
-                    try:
-                        cat_data = json.loads(line.strip())
-                        cat_url = cat_data.get("category_url")
-                        # Get category name, provide default if missing
-                        cat_name = cat_data.get("category_name", f"Unknown Category Line {line_num}")
-
-                        # Basic validation
-                        if not cat_url or not isinstance(cat_url, str) or self.allowed_domains[0] not in cat_url:
-                            self.logger.warning(f"Skipping invalid category entry on line {line_num}: {line.strip()}")
-                            continue
-
-                        # Optional: Skip duplicate URLs from file if necessary
-                        if cat_url in processed_urls:
-                            continue
-                        processed_urls.add(cat_url)
-
-                        self.logger.debug(f"Yielding category request for: {cat_name} - {cat_url}")
-                        yield scrapy.Request(
-                            url=cat_url,
-                            callback=self.parse_category,
-                            errback=self.handle_error,
-                            meta={"category_name": cat_name},  # Pass name for context
-                        )
-
-                    except json.JSONDecodeError:
-                        self.logger.error(f"Failed to decode JSON on line {line_num}: {line.strip()}")
-                    except Exception as e:
-                        self.logger.error(
-                            f"Error processing category line {line_num} ('{line.strip()}'): {e}", exc_info=True
-                        )
+            # The category file is small: read it once, then let orjson parse each line's raw bytes
+            for line_num, line in enumerate(self.category_file.read_bytes().splitlines(), 1):
+                if not line.strip():
+                    continue  # Blank lines (e.g. a trailing one) carry no category
+                try:
+                    cat_data = orjson.loads(line)
+                    cat_url = cat_data.get("category_url")
+                    # Get category name, provide default if missing
+                    cat_name = cat_data.get("category_name", f"Unknown Category Line {line_num}")
+
+                    # Basic validation
+                    if not cat_url or not isinstance(cat_url, str) or self.allowed_domains[0] not in cat_url:
+                        self.logger.warning(f"Skipping invalid category entry on line {line_num}: {line.strip()!r}")
+                        continue
+
+                    # Skip duplicate URLs from file, including variants (query order, fragments)
+                    url_fingerprint = xxhash.xxh3_64_intdigest(canonicalize_url(cat_url).encode())
+                    if url_fingerprint in processed_urls:
+                        continue
+                    processed_urls.add(url_fingerprint)
+
+                    self.logger.debug("Yielding category request for: %s - %s", cat_name, cat_url)
+                    yield scrapy.Request(
+                        url=cat_url,
+                        callback=self.parse_category,
+                        errback=self.handle_error,
+                        meta={"category_name": cat_name},  # Pass name for context
+                    )
+
+                except orjson.JSONDecodeError:
+                    self.logger.error(f"Failed to decode JSON on line {line_num}: {line.strip()!r}")
+                except Exception as e:
+                    self.logger.error(
+                        f"Error processing category line {line_num} ('{line.strip()!r}'): {e}", exc_info=True
+                    )
 
         except FileNotFoundError:
             self.logger.error(f"Category file not found during open: {self.category_file}")
@@ -94,16 +137,16 @@ class StartechProductDetailsSpider(scrapy.Spider):
 
         # --- Extract Product Links ---
         # Selector for the product link within each item block
-        product_link_selector = "div.p-item div.p-item-details h4.p-item-name a::attr(href)"
-        product_links = response.css(product_link_selector).getall()
+        product_links = self._XP_PRODUCT_LINKS(response.selector.root)
 
         if not product_links:
             self.logger.warning(f"No product links found on Startech category page {response.url}")
 
+        urljoin = make_urljoin(response)
         for product_link in product_links:
             # No item limit check needed here - handled by CLOSESPIDER_ITEMCOUNT
-            absolute_product_url = response.urljoin(product_link)
-            self.logger.debug(f"Yielding Startech product request for: {absolute_product_url}")
+            absolute_product_url = urljoin(product_link)
+            self.logger.debug("Yielding Startech product request for: %s", absolute_product_url)
             yield scrapy.Request(
                 url=absolute_product_url,
                 callback=self.parse_product_detail,
@@ -112,13 +155,12 @@ class StartechProductDetailsSpider(scrapy.Spider):
             )
 
         # --- Handle Pagination ---
-        # Selector for the "NEXT" link
-        next_page_selector = 'ul.pagination li a:contains("NEXT")::attr(href)'
-        # Alternative: ul.pagination li:last-child a::attr(href) - check if reliable
-        next_page_url = response.css(next_page_selector).get()
+        # The "NEXT" link, wherever it sits in the pagination list
+        next_page_urls = self._XP_NEXT_PAGE(response.selector.root)
+        next_page_url = next_page_urls[0] if next_page_urls else None
 
         if next_page_url:
-            self.logger.debug(f"Following Startech pagination link: {next_page_url}")
+            self.logger.debug("Following Startech pagination link: %s", next_page_url)
             yield response.follow(
                 next_page_url,
                 callback=self.parse_category,  # Loop back to parse next category page
@@ -136,64 +178,83 @@ class StartechProductDetailsSpider(scrapy.Spider):
         self.logger.info(f"Parsing Startech product details from: {response.url}")
         category_name = response.meta.get("category_name", "Unknown Category")
 
-        loader = ItemLoader(item=StartechProductDetailItem(), response=response)
-
-        # --- Populate Loader using Startech selectors ---
-        loader.add_css("name", "h1.product-name::text")
-        loader.add_value("url", response.url)
-        loader.add_value("category", category_name)
-        # 1. First try to get the price from the main price element
-        loader.add_css("price", "td.product-price::text")
-        # 2. If price not found then try to get it from ins element
-        loader.add_css("price", "td.product-price ins::text")
-        loader.add_css("regular_price", "td.product-regular-price::text")
-        loader.add_css("product_code", "td.product-code::text")
-        loader.add_css("brand", "td.product-brand::text")
-        loader.add_css("availability", "td.product-status::text")
-        loader.add_css("key_features", "div.short-description ul li:not(.view-more)::text")
-        loader.add_css("image_urls", 'meta[itemprop="image"]::attr(content)')
+        root = response.selector.root
+
+        # --- Build the item directly, applying each field's cleaner as its ItemLoader processors did ---
+        # Single-value fields keep the first non-empty cleaned value; list fields keep all values.
+        # Fields without a value are left unset, as load_item() would.
+        fields = {
+            "url": response.url,
+            "category": _first((clean_text(category_name),)),
+            "name": _first(map(clean_html_text, self._XP_NAME(root))),
+            "price": _first(map(parse_price, self._XP_PRICE(root) + self._XP_PRICE_INS(root))),
+            "regular_price": _first(map(parse_price, self._XP_REGULAR_PRICE(root))),
+            "product_code": _first(map(clean_text, self._XP_PRODUCT_CODE(root))),
+            "brand": _first(map(clean_text, self._XP_BRAND(root))),
+            "availability": _first(map(clean_text, self._XP_AVAILABILITY(root))),
+            "key_features": [clean_text(text) for text in self._XP_KEY_FEATURES(root)] or None,
+            "image_urls": [image_url.strip() for image_url in self._XP_IMAGE_URLS(root)] or None,
+        }
+        item = StartechProductDetailItem({name: value for name, value in fields.items() if value is not None})
 
         # --- Extract Description HTML ---
-        description_html_content = response.css("section#description div.full-description").get()
-        if description_html_content:
-            loader.add_value("description_html", description_html_content)
+        description_elements = self._XP_DESCRIPTION(root)
+        if description_elements:
+            description_html_content = clean_html_whitespace(
+                etree.tostring(description_elements[0], method="html", encoding="unicode", with_tail=False)
+            )
+            if description_html_content:
+                item["description_html"] = description_html_content
         else:
             self.logger.debug(
-                f"No description section ('section#description div.full-description') found on {response.url}"
+                "No description section ('section#description div.full-description') found on %s", response.url
             )
         # --- END Description Extraction ---
 
         # --- Parse Specifications Table ---
-        specs = {}
-        current_section = "General"  # Default section
-        spec_table_rows = response.css("section#specification table.data-table > *")
-        for element in spec_table_rows:
-            is_heading = element.xpath("self::thead").get() is not None
-            if is_heading:
-                heading_text = element.css("td.heading-row::text").get()
-                if heading_text:
-                    current_section = clean_text(heading_text)
-                    if current_section not in specs:
-                        specs[current_section] = {}
-            else:  # tbody
-                data_rows = element.css("tr")
-                for row in data_rows:
-                    key_elem = row.css("td.name::text").get()
-                    value_elems = row.css("td.value ::text").getall()
-                    key = clean_text(key_elem) if key_elem else None
-                    value = clean_text(" ".join(value_elems).strip()) if value_elems else None
-                    if key and value:
-                        if current_section not in specs:
-                            specs[current_section] = {}
-                        specs[current_section][key] = value
+        specs = self._extract_specs(root)
 
         if specs:
-            loader.add_value("specifications", specs)
+            item["specifications"] = specs
         else:
             self.logger.warning(f"No specifications dictionary extracted from {response.url}")
 
         # Yield item - Scrapy handles item count for CLOSESPIDER_ITEMCOUNT
-        yield loader.load_item()
+        yield item
+
+    def _extract_specs(self, root):
+        """
+        Builds the {section: {key: value}} specs dict from the spec table in one pass over its parts.
+        A <thead> sets the section for the rows of the bodies that follow it.
+        """
+        specs = defaultdict(dict)
+        current_section = "General"  # Default section
+        for part in self._XP_SPEC_TABLE_PARTS(root):
+            if part.tag == "thead":
+                heading_texts = self._XP_SPEC_HEADING(part)
+                if heading_texts and heading_texts[0]:
+                    current_section = clean_text(heading_texts[0])
+                    specs.setdefault(current_section, {})  # A heading opens its section even without rows
+                continue
+
+            for row in part.iter("tr"):
+                key_elem = None
+                value_words = []
+                for cell in row.iter("td"):
+                    classes = cell.get("class", "").split()
+                    if "name" in classes and key_elem is None:
+                        # td.name::text - the first of the cell's own text nodes
+                        key_elem = cell.text or next((child.tail for child in cell if child.tail), None)
+                    if "value" in classes:
+                        # td.value ::text - every text node in the cell, split into words as it is read
+                        # so whitespace-only nodes vanish and one final join yields the normalized value
+                        for text in cell.itertext():
+                            value_words += text.split()
+                key = clean_text(key_elem) if key_elem else None
+                value = " ".join(value_words) or None
+                if key and value:
+                    specs[current_section][key] = value
+        return dict(specs)
 
     def handle_error(self, failure):
         """Handles errors during request processing."""
@@ -0,0 +1,30 @@
+from urllib.parse import urlsplit
+
+from lxml import etree
+from parsel.csstranslator import css2xpath
+from scrapy.utils.response import get_base_url
+
+
+def compile_css(css):
+    """Translates a parsel CSS query (including ::text / ::attr()) into a reusable compiled XPath."""
+    return etree.XPath(css2xpath(css), smart_strings=False)
+
+
+def make_urljoin(response):
+    """
+    Returns a urljoin function bound to the response's base URL, for loops over many links.
+    Absolute and root-relative links (the bulk of menu and listing links) are joined with plain
+    string operations; anything else falls back to response.urljoin.
+    """
+    base = urlsplit(get_base_url(response))
+    origin = f"{base.scheme}://{base.netloc}"
+
+    def urljoin(link):
+        if link.startswith(("https://", "http://")):
+            return link
+        # "//host/path" is scheme-relative and "/./" or "/../" need dot-segment resolution
+        if link.startswith("/") and not link.startswith("//") and "/." not in link:
+            return origin + link
+        return response.urljoin(link)
+
+    return urljoin